@@ -1,47 +1,18 @@
-import json
-
-import requests
+from mcp_client import ServiceClient
 
 BASE_URL = "http://localhost:8000"
 
 
-def get_system_prompt():
-    url = f"{BASE_URL}/system_prompt"
-    response = requests.get(url)
-    if response.ok:
+if __name__ == "__main__":
+    with ServiceClient(BASE_URL) as client:
         print("System Prompt:")
-        print(response.json()["system_prompt"])
-    else:
-        print("Failed to get system prompt:", response.text)
-
+        print(client.get_system_prompt())
 
-def get_tools(server: str):
-    url = f"{BASE_URL}/tools/{server}"
-    response = requests.get(url)
-    if response.ok:
-        print(f"Tools of server '{server}':")
-        print(response.json()["tools"])
-    else:
-        print(f"Failed to get tools for server '{server}':", response.text)
+        server_name = "filesystem"
+        print(f"Tools of server '{server_name}':")
+        print(client.get_tools(server_name))
 
-
-def execute_tool(server: str, tool: str, args: str):
-    url = f"{BASE_URL}/execute/{server}/{tool}"
-    args = json.loads(args)
-    response = requests.post(url, json=args)
-    if response.ok:
+        tool_name = "write_file"
+        arguments = '{"path": "/data/test.txt", "content": "Test Message"}'
         print("Tool Execution Result:")
-        print(response.json())
-    else:
-        print("Failed to execute tool:", response.text)
-
-
-if __name__ == "__main__":
-    get_system_prompt()
-
-    server_name = "filesystem"
-    get_tools(server_name)
-
-    tool_name = "write_file"
-    arguments = '{"path": "/data/test.txt", "content": "Test Message"}'
-    execute_tool(server_name, tool_name, arguments)
+        print(client.execute_tool(server_name, tool_name, arguments))
@@ -1,27 +1,97 @@
+import os
 import json
+import math
+import time
 import asyncio
-from typing import Dict
+import hashlib
+from typing import Any, Dict, List
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, Request, Response
 from fastapi.responses import JSONResponse
+from pydantic import BaseModel
 
-from mcp_client import MCPClient
+from mcp_client import MCPClient, ToolScheduler, QueueFullError
+from mcp_client.logger import session_id
+from mcp_client.trace import TraceRecorder
 
 def load_config(path:str):
     with open(path) as config_file:
         mcp_config = json.load(config_file)
         return mcp_config
 
-mcp_config = load_config("./servers_config.json")
+def tenant_digest(api_key: str) -> str:
+    """Identifies a tenant without exposing its API key in logs, traces and stats."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+mcp_config = load_config(os.getenv("MCP_CONFIG_PATH", "./servers_config.json"))
+scheduler_config = dict(mcp_config.get("scheduler") or {})
+scheduler_config["tenants"] = {
+    tenant_digest(api_key): weight
+    for api_key, weight in scheduler_config.get("tenants", {}).items()
+}
 
 app = FastAPI()
 mcp_client = MCPClient(mcp_config)
+scheduler = ToolScheduler(scheduler_config)
+recorder = TraceRecorder(os.environ["MCP_TRACE_PATH"]) if os.getenv("MCP_TRACE_PATH") else None
 
 asyncio.create_task(mcp_client.start())
 
 
+def cached_response(request: Request, payload: dict) -> Response:
+    """Builds a JSON response with an ETag, or 304 if the client copy is current."""
+    body = json.dumps(payload).encode()
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+async def run_tool(
+    server: str, tool: str, args: dict[str, Any], tenant: str
+) -> tuple[dict, int]:
+    """Runs a tool call through the scheduler, returns the payload and status code."""
+    tenant_id = tenant_digest(tenant)
+    session_id.set(tenant_id)
+    latency = None
+
+    try:
+        # invalid calls are rejected before they take a slot or queue position
+        args = await mcp_client.validate_arguments(server, tool, args)
+    except Exception as e:
+        return {"result": f"Failed to execute the tool: {e}"}, 200
+
+    async def call():
+        # time the backend only, queueing is left to the replay
+        nonlocal latency
+        started = time.perf_counter()
+        try:
+            return await mcp_client.execute_tool(server, tool, args)
+        finally:
+            latency = time.perf_counter() - started
+
+    try:
+        tool_result = await scheduler.run(server, tool, call, tenant_id)
+    except QueueFullError as e:
+        return {"error": str(e), "retry_after": e.retry_after}, 429
+    except Exception as e:
+        tool_result = f"Failed to execute the tool: {e}"
+
+    if recorder is not None and latency is not None:
+        recorder.record(
+            tenant_id,
+            "tool",
+            server=server,
+            tool=tool,
+            args=args,
+            latency=latency,
+            result=str(tool_result),
+        )
+    return {"result": str(tool_result)}, 200
+
+
 @app.get("/system_prompt")
-async def get_system_prompt():
+async def get_system_prompt(request: Request):
     # list all tools of each server
     mcp_tools = ""
     for server in mcp_client.list_servers():
@@ -37,22 +107,52 @@ async def get_system_prompt():
         "Arguments must be a string in JSON format. After receiving a tool's response, transform the raw data into a natural, conversational response."
         f"Available MCP tools: {mcp_tools}"
     )
-    return JSONResponse({"system_prompt": system_prompt})
+    return cached_response(request, {"system_prompt": system_prompt})
 
 
 @app.get("/tools/{server}")
-async def get_tools(server: str):
-    tools = await mcp_client.list_tools(server)
+async def get_tools(request: Request, server: str):
     tools = f"Tools of MCP server '{server}':\n"
     for tool in await mcp_client.list_tools(server):
         tools += f"{tool}\n"
-    return JSONResponse({"tools": tools})
+    return cached_response(request, {"tools": tools})
 
 
 @app.post("/execute/{server}/{tool}")
-async def execute_tool(server: str, tool: str, args: Dict):
-    try:
-        tool_result = await mcp_client.execute_tool(server, tool, args)
-    except Exception as e:
-        tool_result = f"Failed to execute the tool: {e}"
-    return JSONResponse({"result": str(tool_result)})
+async def execute_tool(
+    server: str, tool: str, args: Dict, x_api_key: str | None = Header(None)
+):
+    payload, status = await run_tool(server, tool, args, x_api_key or "anonymous")
+    headers = None
+    if status == 429:
+        headers = {"Retry-After": str(math.ceil(payload["retry_after"]))}
+    return JSONResponse(payload, status_code=status, headers=headers)
+
+
+class BatchCall(BaseModel):
+    server: str
+    tool: str
+    args: Dict[str, Any] = {}
+
+
+@app.post("/execute_batch")
+async def execute_batch(calls: List[BatchCall], x_api_key: str | None = Header(None)):
+    """
+    Executes several tool calls concurrently.
+
+    The body is a list of {"server", "tool", "args"} objects; the response
+    holds one {"result"} or {"error", "retry_after"} object per call, in order.
+    """
+    tenant = x_api_key or "anonymous"
+    results = await asyncio.gather(
+        *(
+            run_tool(call.server, call.tool, call.args, tenant)
+            for call in calls
+        )
+    )
+    return JSONResponse({"results": [payload for payload, _ in results]})
+
+
+@app.get("/stats")
+async def get_stats():
+    return JSONResponse({"servers": scheduler.stats()})
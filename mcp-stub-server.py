@@ -0,0 +1,27 @@
+import asyncio
+import argparse
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("stub")
+
+
+@mcp.tool()
+async def echo(text: str, delay: float = 0.0) -> str:
+    """Echo the text back after waiting delay seconds."""
+    await asyncio.sleep(delay)
+    return text
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="A local stand-in MCP server.")
+    parser.add_argument(
+        "--transport", choices=["stdio", "sse", "streamable-http"], default="sse"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    mcp.run(transport=args.transport)
@@ -1 +1,8 @@
 from .mcp_client import MCPClient
+from .scheduler import ToolScheduler, QueueFullError
+from .service_client import (
+    ServiceClient,
+    AsyncServiceClient,
+    ServiceError,
+    ServiceBusyError,
+)
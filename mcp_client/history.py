@@ -0,0 +1,134 @@
+import json
+from typing import Any, Iterator
+
+
+class Message:
+    """
+    A compact, immutable chat message that caches its JSON encoding.
+
+    Messages are normalized to plain fields on creation, so no SDK objects
+    are kept alive, and encoded at most once however many requests they are
+    sent with.
+    """
+
+    __slots__ = ("role", "content", "name", "tool_call_id", "tool_calls", "_encoded")
+
+    def __init__(
+        self,
+        role: str,
+        content: str | None = None,
+        name: str | None = None,
+        tool_call_id: str | None = None,
+        tool_calls: tuple[dict[str, Any], ...] | None = None,
+    ) -> None:
+        self.role = role
+        self.content = content
+        self.name = name
+        self.tool_call_id = tool_call_id
+        self.tool_calls = tool_calls
+        self._encoded: str | None = None
+
+    @classmethod
+    def from_any(cls, message: "Message | dict[str, Any] | Any") -> "Message":
+        """Normalizes a dict or an OpenAI ChatCompletionMessage into a Message."""
+        if isinstance(message, Message):
+            return message
+        if not isinstance(message, dict):
+            message = message.model_dump(exclude_none=True)
+
+        tool_calls = message.get("tool_calls")
+        if tool_calls:
+            tool_calls = tuple(
+                {
+                    "id": call["id"],
+                    "type": call.get("type", "function"),
+                    "function": {
+                        "name": call["function"]["name"],
+                        "arguments": call["function"]["arguments"],
+                    },
+                }
+                for call in tool_calls
+            )
+        return cls(
+            message["role"],
+            message.get("content"),
+            message.get("name"),
+            message.get("tool_call_id"),
+            tool_calls or None,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {"role": self.role, "content": self.content}
+        if self.name is not None:
+            result["name"] = self.name
+        if self.tool_call_id is not None:
+            result["tool_call_id"] = self.tool_call_id
+        if self.tool_calls is not None:
+            result["tool_calls"] = list(self.tool_calls)
+        return result
+
+    @property
+    def encoded(self) -> str:
+        """The JSON encoding of the message, computed on first use."""
+        if self._encoded is None:
+            self._encoded = json.dumps(self.to_dict(), ensure_ascii=False)
+        return self._encoded
+
+    def __repr__(self) -> str:
+        return f"Message({self.to_dict()!r})"
+
+
+class MessageStore:
+    """
+    The conversation history of a chat session.
+
+    Appended messages are normalized into Message objects, and request bodies
+    are built by joining their cached JSON fragments, so the encoding cost of
+    a turn depends on the new messages only.
+    """
+
+    __slots__ = ("_messages",)
+
+    def __init__(self) -> None:
+        self._messages: list[Message] = []
+
+    def append(self, message: Message | dict[str, Any] | Any) -> None:
+        self._messages.append(Message.from_any(message))
+
+    def extend(self, messages) -> None:
+        for message in messages:
+            self.append(message)
+
+    def clear(self) -> None:
+        self._messages.clear()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages)
+
+    def __getitem__(self, index):
+        return self._messages[index]
+
+    def to_list(self) -> list[dict[str, Any]]:
+        return [message.to_dict() for message in self._messages]
+
+    def encode(self) -> str:
+        """Returns the messages as a JSON array."""
+        return "[" + ",".join(message.encoded for message in self._messages) + "]"
+
+    def encode_request(self, params: dict[str, Any]) -> bytes:
+        """
+        Builds a chat completion request body from params and the messages.
+
+        Args:
+            params (dict): The request fields other than "messages".
+
+        Returns:
+            bytes: The JSON encoded request body.
+        """
+        head = json.dumps(params, ensure_ascii=False)
+        if head == "{}":
+            return ('{"messages": ' + self.encode() + "}").encode()
+        return (head[:-1] + ', "messages": ' + self.encode() + "}").encode()
@@ -1,10 +1,17 @@
 import json
+import time
+import uuid
+import random
 import asyncio
 from datetime import datetime
 
-from openai import OpenAI
+import httpx
+import openai
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
 
-from .logger import logger
+from .logger import logger, session_id, truncate
+from .history import MessageStore
+from .trace import TraceRecorder
 from . import MCPClient
 
 
@@ -34,6 +41,7 @@ class OpenAIChat:
         base_url: str = "https://openrouter.ai/api/v1",
         site_url=None,
         site_name=None,
+        recorder: TraceRecorder | None = None,
     ):
         """
         Initializes the LLMClient.
@@ -45,16 +53,21 @@ class OpenAIChat:
             base_url (str, optional): The base URL of the OpenRouter API. Defaults to "https://openrouter.ai/api/v1".
             site_url (str, optional): Your site URL for rankings on OpenRouter.ai. Defaults to None.
             site_name (str, optional): Your site title for rankings on OpenRouter.ai. Defaults to None.
+            recorder (TraceRecorder, optional): Records the session to a trace for replay. Defaults to None.
         """
         self.api_key = api_key
         self.base_url = base_url
         self.site_url = site_url
         self.site_name = site_name
         self.model = model
-        self.client = OpenAI(
-            base_url=self.base_url,
-            api_key=self.api_key,
-        )
+        self.recorder = recorder
+        self.session_id = uuid.uuid4().hex
+        # the error that ended the last turn, if it failed
+        self.last_error: Exception | None = None
+        # completions are posted directly with pre-encoded bodies; failed
+        # requests are retried like the OpenAI SDK does (max_retries=2)
+        self.http_client = httpx.Client(timeout=httpx.Timeout(600.0, connect=5.0))
+        self.max_retries = 2
 
         self.system_prompt = (
             "You are a helpful assistant with access to MCP(Model Context Protocol) Servers."
@@ -63,7 +76,7 @@ class OpenAIChat:
             "After receiving a tool's response, transform the raw data into a natural, conversational response."
             f"Users in the timezone Asia/Taipei. Today is {get_today()}"
         )
-        self.conversation_history = []
+        self.conversation_history = MessageStore()
 
         self.mcp_client = MCPClient(mcp_config_path)
         self.mcp_functions = [
@@ -127,11 +140,142 @@ class OpenAIChat:
             result += f"\n{str(tool)}"
         return result
 
-    async def execute_tool(self, server_name: str, tool_name: str, args: str) -> str:
-        args = json.loads(args)
+    async def execute_tool(
+        self, server_name: str, tool_name: str, args: str = "{}"
+    ) -> str:
+        try:
+            args = json.loads(args) if isinstance(args, str) else args
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Arguments of tool '{tool_name}' are not valid JSON: {e}")
+        started = time.perf_counter()
         result = await self.mcp_client.execute_tool(server_name, tool_name, args)
+        self._record(
+            "tool",
+            server=server_name,
+            tool=tool_name,
+            args=args,
+            latency=time.perf_counter() - started,
+            result=str(result),
+        )
         return str(result)
 
+    def _record(self, kind: str, **fields) -> None:
+        """Writes an event of this session to the trace, if recording."""
+        if self.recorder is not None:
+            self.recorder.record(self.session_id, kind, **fields)
+
+    def _post(self, params: dict) -> httpx.Request:
+        """Builds a chat completion request for the conversation history."""
+        body = self.conversation_history.encode_request({"model": self.model, **params})
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            **self._build_extra_headers(),
+        }
+        return self.http_client.build_request(
+            "POST",
+            f"{self.base_url.rstrip('/')}/chat/completions",
+            content=body,
+            headers=headers,
+        )
+
+    def _retry_delay(self, attempt: int, response: httpx.Response | None) -> float:
+        """Returns how long to wait before a retry, honoring Retry-After."""
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+            except ValueError:
+                retry_after = None
+            if retry_after is not None and 0 < retry_after <= 60:
+                return retry_after
+        # exponential backoff with jitter, as in the OpenAI SDK
+        return min(0.5 * 2**attempt, 8.0) * (1 - 0.25 * random.random())
+
+    def _send(self, params: dict, stream: bool = False) -> httpx.Response:
+        """
+        Sends a chat completion request, retrying on 408, 409, 429, 5xx and
+        connection errors.
+
+        Raises:
+            openai.APIStatusError: If the API answers with an error status.
+            openai.APIConnectionError: If the API cannot be reached.
+        """
+        request = self._post(params)
+        for attempt in range(self.max_retries + 1):
+            retry = attempt < self.max_retries
+            try:
+                response = self.http_client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                if not retry:
+                    if isinstance(e, httpx.TimeoutException):
+                        raise openai.APITimeoutError(request=request) from e
+                    raise openai.APIConnectionError(request=request) from e
+                logger.warning("LLM request failed (%s), retrying", e)
+                time.sleep(self._retry_delay(attempt, None))
+                continue
+
+            if response.is_success:
+                return response
+            status = response.status_code
+            if retry and (status in (408, 409, 429) or status >= 500):
+                response.close()
+                logger.warning("LLM request failed with status %d, retrying", status)
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+
+            response.read()
+            try:
+                body = response.json()
+            except ValueError:
+                body = response.text
+            raise openai.APIStatusError(
+                f"Error code: {status} - {body}", response=response, body=body
+            )
+
+    def _check_payload(self, payload: dict, request: httpx.Request) -> None:
+        """Raises the error an API returned in place of a completion or chunk."""
+        if "error" in payload:
+            error = payload["error"]
+            message = error.get("message") if isinstance(error, dict) else None
+            raise openai.APIError(message or str(error), request, body=error)
+
+    def _create_completion(self, **params) -> ChatCompletion:
+        """Requests a (non-streaming) completion and records its latency."""
+        started = time.perf_counter()
+        response = self._send(params)
+        payload = response.json()
+        self._check_payload(payload, response.request)
+        if not payload.get("choices"):
+            raise openai.APIError(
+                "The completion has no choices", response.request, body=payload
+            )
+        completion = ChatCompletion.construct(**payload)
+        if self.recorder is not None:
+            self._record(
+                "llm",
+                latency=time.perf_counter() - started,
+                message=completion.choices[0].message.model_dump(exclude_none=True),
+            )
+        return completion
+
+    def _stream_completion(self, **params):
+        """Requests a streaming completion, yields its chunks."""
+        response = self._send({**params, "stream": True}, stream=True)
+        try:
+            for line in response.iter_lines():
+                # skip SSE comments and keep-alives
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                payload = json.loads(data)
+                # errors after the stream started arrive as a data line
+                self._check_payload(payload, response.request)
+                yield ChatCompletionChunk.construct(**payload)
+        finally:
+            response.close()
+
     def _build_extra_headers(self):
         """Builds the extra headers for the API request."""
         extra_headers = {}
@@ -152,21 +296,18 @@ class OpenAIChat:
             str: The response from the LLM.  Returns None if there's an error.
         """
 
+        token = session_id.set(self.session_id)
+        self.last_error = None
+
         # Add user message to history
         self.conversation_history.append({"role": "user", "content": content})
+        self._record("turn", content=content)
 
         try:
-            completion_kwargs = {
-                "extra_headers": self._build_extra_headers(),
-                "extra_body": {},
-                "model": self.model,
-                "messages": self.conversation_history,
-                "tools": self.mcp_functions,
-                "tool_choice": "auto",
-            }
-
             # send to model
-            completion = self.client.chat.completions.create(**completion_kwargs)
+            completion = self._create_completion(
+                tools=self.mcp_functions, tool_choice="auto"
+            )
             response_message = completion.choices[0].message
 
             if response_message.tool_calls is None:
@@ -182,7 +323,7 @@ class OpenAIChat:
                 for tool_call in response_message.tool_calls:
                     # extract function name and args from model response
                     function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
+                    function_args = tool_call.function.arguments
 
                     # try to call tool
                     function_to_call = self.function_mapping.get(function_name)
@@ -190,10 +331,15 @@ class OpenAIChat:
                         function_result = f"Error: Function {function_name} not found."
                     else:
                         logger.info(
-                            f"Call function '{function_name}' with args {function_args}"
+                            "Call function '%s' with args %s",
+                            function_name,
+                            truncate(function_args),
+                            extra={"sampled": True},
                         )
                         try:
-                            function_result = await function_to_call(**function_args)
+                            function_result = await function_to_call(
+                                **json.loads(function_args)
+                            )
                             function_result = str(function_result)
                         except Exception as e:
                             function_result = (
@@ -215,12 +361,7 @@ class OpenAIChat:
                 self.conversation_history.extend(tool_responses)
 
                 # send tool messages to model
-                second_completion = self.client.chat.completions.create(
-                    extra_headers=self._build_extra_headers(),
-                    extra_body={},
-                    model=self.model,
-                    messages=self.conversation_history,
-                )
+                second_completion = self._create_completion()
 
                 response_content = second_completion.choices[0].message.content
                 self.conversation_history.append(
@@ -229,16 +370,19 @@ class OpenAIChat:
                 return response_content
 
         except Exception as e:
-            logger.error(f"Error communicating with LLM: {e}")
+            logger.error("Error communicating with LLM: %s", e)
+            self.last_error = e
             return None
+        finally:
+            session_id.reset(token)
 
     def get_conversation_history(self):
         """Returns the entire conversation history."""
-        return self.conversation_history
+        return self.conversation_history.to_list()
 
     def clear_conversation_history(self):
         """Clears the conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
 
 
 class StreamingChat(OpenAIChat):
@@ -250,8 +394,11 @@ class StreamingChat(OpenAIChat):
         base_url="https://openrouter.ai/api/v1",
         site_url=None,
         site_name=None,
+        recorder=None,
     ):
-        super().__init__(api_key, model, mcp_config_path, base_url, site_url, site_name)
+        super().__init__(
+            api_key, model, mcp_config_path, base_url, site_url, site_name, recorder
+        )
         self.system_prompt += (
             "If you want to use MCP tool, your response should start with <MCP_CALL>, and a JSON string in following format.\n"
             "<MCP_CALL>{"
@@ -296,29 +443,35 @@ class StreamingChat(OpenAIChat):
                        Handle these exceptions appropriately on the calling side.
         """
 
+        token = session_id.set(self.session_id)
+        self.last_error = None
+
         # Add user message to history
         self.conversation_history.append({"role": "user", "content": content})
+        self._record("turn", content=content)
 
         try:
-            completion_kwargs = {
-                "extra_headers": self._build_extra_headers(),
-                "extra_body": {},
-                "model": self.model,
-                "messages": self.conversation_history,
-                "stream": True,
-            }
-
             # send to model
-            response = self.client.chat.completions.create(**completion_kwargs)
+            started = time.perf_counter()
+            response = self._stream_completion()
             full_content = ""
+            first_token = None
 
             for chunk in response:
                 if chunk.choices:
                     content = chunk.choices[0].delta.content
                     if content is not None:
+                        if first_token is None:
+                            first_token = time.perf_counter() - started
                         full_content += content
                         yield content
                         await asyncio.sleep(0)  # force flush the buffer
+            self._record(
+                "llm",
+                latency=time.perf_counter() - started,
+                first_token=first_token,
+                message={"role": "assistant", "content": full_content},
+            )
             self.conversation_history.append(
                 {
                     "role": "assistant",
@@ -332,7 +485,7 @@ class StreamingChat(OpenAIChat):
                 mcp_calls = full_content.split("</MCP_CALL>")
                 tool_result = ""
 
-                logger.info(f"Execute {len(mcp_calls) - 1} MCP calls")
+                logger.info("Execute %d MCP calls", len(mcp_calls) - 1)
                 for mcp_call in mcp_calls:
                     mcp_call = mcp_call.strip()
                     if not mcp_call.startswith("<MCP_CALL>"):
@@ -346,9 +499,18 @@ class StreamingChat(OpenAIChat):
 
                     # try mcp tool call
                     try:
+                        started = time.perf_counter()
                         res = await self.mcp_client.execute_tool(
                             mcp_server, mcp_tool, args
                         )
+                        self._record(
+                            "tool",
+                            server=mcp_server,
+                            tool=mcp_tool,
+                            args=args,
+                            latency=time.perf_counter() - started,
+                            result=str(res),
+                        )
                         tool_result += f"{res}\n"
                     except Exception as e:
                         tool_result += f"Error: {e}\n"
@@ -360,26 +522,37 @@ class StreamingChat(OpenAIChat):
                 )
 
                 # Send tool result to LLM
-                second_res = self.client.chat.completions.create(
-                    extra_headers=self._build_extra_headers(),
-                    extra_body={},
-                    model=self.model,
-                    messages=self.conversation_history,
-                    stream=True,
-                )
+                started = time.perf_counter()
+                second_res = self._stream_completion()
 
                 full_content = ""
+                first_token = None
                 for chunk in second_res:
                     if chunk.choices:
                         content = chunk.choices[0].delta.content
                         if content is not None:
+                            if first_token is None:
+                                first_token = time.perf_counter() - started
                             full_content += content
                             yield content
                             await asyncio.sleep(0)  # force flush the buffer
+                self._record(
+                    "llm",
+                    latency=time.perf_counter() - started,
+                    first_token=first_token,
+                    message={"role": "assistant", "content": full_content},
+                )
 
                 self.conversation_history.append(
                     {"role": "assistant", "content": full_content}
                 )
         except Exception as e:
-            logger.error(f"Error communicating with LLM: {e}")
+            logger.error("Error communicating with LLM: %s", e)
+            self.last_error = e
             return
+        finally:
+            try:
+                session_id.reset(token)
+            except ValueError:
+                # closed by the event loop's finalizer, in another context
+                pass
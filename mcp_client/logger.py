@@ -1,8 +1,152 @@
+import os
+import json
+import queue
+import atexit
 import logging
+import threading
+import contextvars
+import logging.handlers
+from typing import Any
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(module)s][%(levelname)s] - %(message)s",
+# IDs attached to every record logged within a chat session or tool call
+session_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "session_id", default=None
 )
+call_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "call_id", default=None
+)
+
+MAX_PAYLOAD = int(os.getenv("MCP_LOG_MAX_PAYLOAD", "512"))
+
+
+class Truncated:
+    """Defers str() of a log argument to formatting time and truncates it."""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = str(self.value)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[: self.limit]}... ({len(text)} chars)"
+
+    __repr__ = __str__
+
+
+def truncate(value: Any, limit: int | None = None) -> Truncated:
+    """Wraps a (possibly large) payload so it is logged lazily and truncated."""
+    return Truncated(value, MAX_PAYLOAD if limit is None else limit)
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the session and call IDs of the emitting context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.session_id = session_id.get()
+        record.call_id = call_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one out of every N records marked with extra={"sampled": True}.
+
+    Counters are kept per message template, so each hot-path event is
+    sampled independently. Other records always pass.
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self.counters: dict[str, int] = dict()
+        # records are emitted from every thread that logs
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or not getattr(record, "sampled", False):
+            return True
+        with self._lock:
+            count = self.counters.get(record.msg, 0)
+            self.counters[record.msg] = count + 1
+        return count % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    Tracebacks arrive already merged into the message by the QueueHandler.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "module": record.module,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "session_id", None) is not None:
+            entry["session_id"] = record.session_id
+        if getattr(record, "call_id", None) is not None:
+            entry["call_id"] = record.call_id
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(
+    level: str | None = None,
+    log_format: str | None = None,
+    sample_every: int | None = None,
+) -> logging.handlers.QueueListener | None:
+    """
+    Routes logging through a queue so handler I/O runs on a background thread.
+
+    Does nothing if the root logger already has handlers, like logging.basicConfig.
+
+    Args:
+        level (str, optional): The log level. Defaults to $MCP_LOG_LEVEL or "INFO".
+        log_format (str, optional): "json" or "text". Defaults to $MCP_LOG_FORMAT or "json".
+        sample_every (int, optional): Keep one of every N sampled records. Defaults to $MCP_LOG_SAMPLE_EVERY or 1.
+
+    Returns:
+        The started QueueListener, or None if logging was already configured.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+
+    level = level or os.getenv("MCP_LOG_LEVEL", "INFO")
+    log_format = log_format or os.getenv("MCP_LOG_FORMAT", "json")
+    if sample_every is None:
+        sample_every = int(os.getenv("MCP_LOG_SAMPLE_EVERY", "1"))
+
+    stream_handler = logging.StreamHandler()
+    if log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s [%(module)s][%(levelname)s] - %(message)s")
+        )
+
+    # QueueHandler merges the message and traceback on the emitting thread, so
+    # the listener never touches live arguments
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(SamplingFilter(sample_every))
+    queue_handler.addFilter(ContextFilter())
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(
+        queue_handler.queue, stream_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+setup_logging()
 
 logger = logging.getLogger(__name__)
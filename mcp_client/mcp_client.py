@@ -20,10 +20,15 @@ class MCPClient:
         return list(self.servers.keys())
 
     async def list_tools(self, server_name: str) -> list[Tool]:
-        logger.info(f"List tools of MCP server '{server_name}'.")
+        logger.info("List tools of MCP server '%s'.", server_name)
         tool_list = await self.servers[server_name].list_tool()
         return tool_list
 
+    async def validate_arguments(
+        self, server_name: str, tool_name: str, arguments: dict[str, Any] | str
+    ) -> dict[str, Any]:
+        return await self.servers[server_name].validate_arguments(tool_name, arguments)
+
     async def execute_tool(
         self,
         server_name: str,
@@ -38,7 +43,7 @@ class MCPClient:
         return result
 
     async def list_resource(self, server_name: str):
-        logger.info(f"List resources of MCP server '{server_name}'")
+        logger.info("List resources of MCP server '%s'", server_name)
         resource_list = await self.servers[server_name].list_resources()
         return resource_list
 
@@ -47,5 +52,6 @@ class MCPClient:
         return str(resource)
 
     async def clean_all(self):
-        for server in self.servers.values():
+        # connections are nested context managers, close them in reverse order
+        for server in reversed(list(self.servers.values())):
             await server.cleanup()
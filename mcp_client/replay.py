@@ -0,0 +1,342 @@
+import os
+import json
+import time
+import asyncio
+import tempfile
+import threading
+import resource
+import tracemalloc
+import importlib.util
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import httpx
+
+from .llm_client import OpenAIChat, StreamingChat
+from .service_client import AsyncServiceClient
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = round(percent / 100 * (len(ordered) - 1))
+    return ordered[min(len(ordered) - 1, index)]
+
+
+def _tool_key(server: str, tool: str, args: Any) -> str:
+    return json.dumps([server, tool, args], sort_keys=True, default=str)
+
+
+class StubMCPClient:
+    """
+    Stands in for MCPClient, answering tool calls with recorded results.
+
+    Each call sleeps for the latency recorded for the same server, tool and
+    arguments (or the mean latency of the tool), divided by the replay speed.
+    """
+
+    def __init__(self, sessions: dict[str, list[dict[str, Any]]], speed: float = 1.0):
+        self.speed = speed
+        self.calls: dict[str, tuple[float, str]] = dict()
+        latencies: dict[tuple[str, str], list[float]] = dict()
+        for events in sessions.values():
+            for event in events:
+                if event["kind"] != "tool":
+                    continue
+                key = _tool_key(event["server"], event["tool"], event.get("args"))
+                self.calls[key] = (event["latency"], event.get("result", ""))
+                latencies.setdefault((event["server"], event["tool"]), []).append(
+                    event["latency"]
+                )
+        self.mean_latency = {
+            key: sum(values) / len(values) for key, values in latencies.items()
+        }
+        self.servers = sorted({server for server, _ in self.mean_latency})
+
+    async def start(self):
+        pass
+
+    def list_servers(self) -> list[str]:
+        return list(self.servers)
+
+    async def list_tools(self, server_name: str) -> list:
+        return []
+
+    async def validate_arguments(
+        self, server_name: str, tool_name: str, arguments: Any
+    ) -> Any:
+        return json.loads(arguments) if isinstance(arguments, str) else arguments
+
+    async def execute_tool(
+        self, server_name: str, tool_name: str, arguments: Any, *_args, **_kwargs
+    ) -> str:
+        if isinstance(arguments, str):
+            arguments = json.loads(arguments)
+        latency, result = self.calls.get(
+            _tool_key(server_name, tool_name, arguments),
+            (self.mean_latency.get((server_name, tool_name), 0.0), ""),
+        )
+        await asyncio.sleep(latency / self.speed)
+        return result
+
+    async def clean_all(self):
+        pass
+
+
+def stub_llm_client(events: list[dict[str, Any]], speed: float = 1.0) -> httpx.Client:
+    """
+    Creates an HTTP client whose transport replays recorded LLM replies.
+
+    Replies are served in recorded order after sleeping for the recorded
+    latency divided by speed. The sleep blocks the calling thread, like the
+    synchronous HTTP client used by OpenAIChat does.
+    """
+    replies = deque(event for event in events if event["kind"] == "llm")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if replies:
+            event = replies.popleft()
+            message = event["message"]
+            latency = event["latency"]
+        else:
+            message = {"role": "assistant", "content": ""}
+            latency = 0.0
+        time.sleep(latency / speed)
+
+        if not body.get("stream"):
+            completion = {
+                "id": "replay",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body.get("model", "replay"),
+                "choices": [
+                    {"index": 0, "message": message, "finish_reason": "stop"}
+                ],
+            }
+            return httpx.Response(200, json=completion)
+
+        content = message.get("content") or ""
+        lines = []
+        for start in range(0, len(content), 16):
+            chunk = {
+                "id": "replay",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body.get("model", "replay"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": content[start : start + 16]},
+                        "finish_reason": None,
+                    }
+                ],
+            }
+            lines.append(f"data: {json.dumps(chunk)}\n\n")
+        lines.append("data: [DONE]\n\n")
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content="".join(lines).encode(),
+        )
+
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def load_service(path: str = "mcp-service.py"):
+    """
+    Imports mcp-service.py with an empty MCP config, for in-process replay.
+
+    The environment is only changed while the module is loading.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config:
+        json.dump({"mcpServers": {}}, config)
+    saved = {
+        name: os.environ.get(name) for name in ("MCP_CONFIG_PATH", "MCP_TRACE_PATH")
+    }
+    os.environ["MCP_CONFIG_PATH"] = config.name
+    os.environ.pop("MCP_TRACE_PATH", None)
+
+    try:
+        spec = importlib.util.spec_from_file_location("mcp_service", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        os.unlink(config.name)
+    return module
+
+
+class Replayer:
+    """
+    Re-drives recorded sessions at a speed-up factor with many concurrent sessions.
+
+    In "chat" and "stream" mode every session runs a real OpenAIChat or
+    StreamingChat wired to stub LLM and MCP backends, in a thread with its own
+    event loop, like one bot process per session. In "service" mode the
+    recorded tool calls are sent to mcp-service.py, in-process with a stub MCP
+    backend unless a URL is given.
+    """
+
+    def __init__(
+        self,
+        sessions: dict[str, list[dict[str, Any]]],
+        mode: str = "chat",
+        concurrency: int = 1,
+        speed: float = 1.0,
+        url: str | None = None,
+        service_path: str = "mcp-service.py",
+    ):
+        if mode not in ("chat", "stream", "service"):
+            raise ValueError(f"Unknown replay mode '{mode}'")
+        if not sessions:
+            raise ValueError("The trace has no sessions")
+
+        self.sessions = list(sessions.values())
+        self.mode = mode
+        self.concurrency = concurrency
+        self.speed = speed
+        self.url = url
+        self.service_path = service_path
+        self.mcp_client = StubMCPClient(sessions, speed)
+
+        self.latencies: list[float] = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _add_latency(self, latency: float) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+
+    def _add_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    async def _wait_until(self, started: float, offset: float) -> None:
+        delay = started + offset / self.speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _replay_chat(self, events: list[dict[str, Any]]) -> None:
+        chat_class = StreamingChat if self.mode == "stream" else OpenAIChat
+        chat = chat_class("replay", "replay", {"mcpServers": {}})
+        chat.http_client = stub_llm_client(events, self.speed)
+        chat.mcp_client = self.mcp_client
+        await chat.start()
+
+        started = time.perf_counter()
+        first_ts = events[0]["ts"]
+        for event in events:
+            if event["kind"] != "turn":
+                continue
+            await self._wait_until(started, event["ts"] - first_ts)
+
+            turn_started = time.perf_counter()
+            if self.mode == "stream":
+                # StreamingChat logs failures and ends the stream
+                async for _ in chat.send_message(event["content"]):
+                    pass
+                failed = chat.last_error is not None
+            else:
+                failed = await chat.send_message(event["content"]) is None
+            if failed:
+                self._add_error()
+            else:
+                self._add_latency(time.perf_counter() - turn_started)
+
+    async def _replay_service(
+        self, events: list[dict[str, Any]], client: AsyncServiceClient
+    ) -> None:
+        started = time.perf_counter()
+        first_ts = events[0]["ts"]
+        for event in events:
+            if event["kind"] != "tool":
+                continue
+            await self._wait_until(started, event["ts"] - first_ts)
+
+            call_started = time.perf_counter()
+            try:
+                await client.execute_tool(
+                    event["server"], event["tool"], event.get("args") or {}
+                )
+                self._add_latency(time.perf_counter() - call_started)
+            except Exception:
+                self._add_error()
+
+    async def run(self, trace_memory: bool = False) -> dict[str, Any]:
+        """
+        Runs the replay and returns its report.
+
+        Args:
+            trace_memory (bool, optional): Track the peak Python heap with tracemalloc. Defaults to False.
+
+        Returns:
+            dict: Throughput, latency percentiles and peak memory of the run.
+        """
+        if trace_memory:
+            tracemalloc.start()
+
+        client = None
+        if self.mode == "service":
+            if self.url is not None:
+                client = AsyncServiceClient(self.url, max_connections=self.concurrency)
+            else:
+                service = load_service(self.service_path)
+                service.mcp_client = self.mcp_client
+                client = AsyncServiceClient(
+                    "http://replay.invalid",
+                    transport=httpx.ASGITransport(app=service.app),
+                )
+
+        loop = asyncio.get_running_loop()
+        executor = None
+        if self.mode != "service":
+            executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        started = time.perf_counter()
+        tasks = []
+        for index in range(self.concurrency):
+            events = self.sessions[index % len(self.sessions)]
+            if self.mode == "service":
+                tasks.append(self._replay_service(events, client))
+            else:
+                tasks.append(
+                    loop.run_in_executor(executor, asyncio.run, self._replay_chat(events))
+                )
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        if executor is not None:
+            executor.shutdown()
+        if client is not None:
+            await client.close()
+
+        report = {
+            "mode": self.mode,
+            "sessions": self.concurrency,
+            "speed": self.speed,
+            "elapsed": round(elapsed, 3),
+            "completed": len(self.latencies),
+            "errors": self.errors,
+            "throughput": round(len(self.latencies) / elapsed, 3) if elapsed else 0.0,
+            # ru_maxrss is in KiB on Linux
+            "peak_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+        }
+        if self.latencies:
+            report["latency"] = {
+                f"p{percent}": round(_percentile(self.latencies, percent), 4)
+                for percent in (50, 90, 99)
+            }
+            report["latency"]["max"] = round(max(self.latencies), 4)
+        if trace_memory:
+            report["peak_heap_mb"] = round(
+                tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1
+            )
+            tracemalloc.stop()
+        return report
@@ -0,0 +1,262 @@
+import heapq
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable
+
+from .logger import logger
+
+
+class QueueFullError(Exception):
+    """Raised when a call cannot be admitted because its queue is full."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Pending:
+    """A queued call waiting for a free slot."""
+
+    __slots__ = ("tenant", "tool", "future")
+
+    def __init__(self, tenant: str, tool: str, future: asyncio.Future):
+        self.tenant = tenant
+        self.tool = tool
+        self.future = future
+
+
+class _ServerQueue:
+    """Admission state of a single MCP server."""
+
+    def __init__(self, max_concurrency: int, max_queue: int, tools: dict[str, Any]):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.tool_limits: dict[str, tuple[int, int]] = {
+            name: (
+                cfg.get("max_concurrency", max_concurrency),
+                cfg.get("max_queue", max_queue),
+            )
+            for name, cfg in tools.items()
+        }
+
+        self.running = 0
+        self.tool_running: dict[str, int] = {}
+        self.tool_queued: dict[str, int] = {}
+        self.tenant_queued: dict[str, int] = {}
+        self.heap: list[tuple[float, int, _Pending]] = []
+        self.queued = 0
+        self.rejected = 0
+
+        # weighted fair queuing state
+        self.virtual_time = 0.0
+        self.last_finish: dict[str, float] = {}
+
+        # moving average of call latency, used for Retry-After hints
+        self.avg_latency = 1.0
+
+    def tool_limit(self, tool: str) -> tuple[int, int]:
+        return self.tool_limits.get(tool, (self.max_concurrency, self.max_queue))
+
+
+class ToolScheduler:
+    """
+    Admission control and weighted fair scheduling for MCP tool calls.
+
+    Every server has a concurrency limit and a bounded wait queue, and each
+    tool of a server may have tighter limits of its own. Waiting calls are
+    dispatched in weighted fair queuing order across tenants (API keys), so a
+    single tenant flooding a slow tool cannot starve the others.
+    """
+
+    def __init__(self, config: dict[str, Any] | None = None):
+        """
+        Initializes the scheduler.
+
+        Args:
+            config (dict, optional): The "scheduler" section of servers_config.json.
+                Supports "max_concurrency", "max_queue", per-server overrides in
+                "servers" (with per-tool overrides in "tools") and tenant
+                weights in "tenants". Defaults to None.
+        """
+        config = config or {}
+        self.max_concurrency: int = config.get("max_concurrency", 4)
+        self.max_queue: int = config.get("max_queue", 32)
+        self.server_config: dict[str, Any] = config.get("servers", {})
+        self.tenant_weights: dict[str, float] = config.get("tenants", {})
+        self.default_weight: float = config.get("default_weight", 1.0)
+
+        self._servers: dict[str, _ServerQueue] = dict()
+        self._seq = itertools.count()
+
+    def _server(self, name: str) -> _ServerQueue:
+        queue = self._servers.get(name)
+        if queue is None:
+            cfg = self.server_config.get(name, {})
+            queue = _ServerQueue(
+                cfg.get("max_concurrency", self.max_concurrency),
+                cfg.get("max_queue", self.max_queue),
+                cfg.get("tools", {}),
+            )
+            self._servers[name] = queue
+        return queue
+
+    def _retry_after(self, queue: _ServerQueue) -> float:
+        """Estimate how long until the backlog of a server drains."""
+        waiting = queue.queued + queue.running
+        return max(1.0, queue.avg_latency * waiting / queue.max_concurrency)
+
+    def _can_run(self, queue: _ServerQueue, tool: str) -> bool:
+        tool_concurrency, _ = queue.tool_limit(tool)
+        return (
+            queue.running < queue.max_concurrency
+            and queue.tool_running.get(tool, 0) < tool_concurrency
+        )
+
+    def _acquire(self, queue: _ServerQueue, tool: str) -> None:
+        queue.running += 1
+        queue.tool_running[tool] = queue.tool_running.get(tool, 0) + 1
+
+    def _release(self, queue: _ServerQueue, tool: str) -> None:
+        queue.running -= 1
+        queue.tool_running[tool] -= 1
+
+    def _dequeue(self, queue: _ServerQueue, pending: _Pending) -> None:
+        queue.queued -= 1
+        queue.tool_queued[pending.tool] -= 1
+        queue.tenant_queued[pending.tenant] -= 1
+        if queue.tenant_queued[pending.tenant] == 0:
+            # an idle tenant's finish time is behind the virtual time, drop it
+            del queue.tenant_queued[pending.tenant]
+            queue.last_finish.pop(pending.tenant, None)
+
+    def _dispatch(self, queue: _ServerQueue) -> None:
+        """Hand free slots to waiting calls in fair order."""
+        skipped = []
+        while queue.heap and queue.running < queue.max_concurrency:
+            entry = heapq.heappop(queue.heap)
+            pending = entry[2]
+            if pending.future.done():
+                # cancelled while waiting
+                continue
+            if not self._can_run(queue, pending.tool):
+                # the tool is saturated, let calls of other tools go first
+                skipped.append(entry)
+                continue
+
+            queue.virtual_time = max(queue.virtual_time, entry[0])
+            self._dequeue(queue, pending)
+            self._acquire(queue, pending.tool)
+            pending.future.set_result(None)
+
+        for entry in skipped:
+            heapq.heappush(queue.heap, entry)
+
+    async def _wait(self, server: str, tool: str, tenant: str) -> None:
+        queue = self._server(server)
+        if not queue.heap and self._can_run(queue, tool):
+            self._acquire(queue, tool)
+            return
+
+        _, tool_max_queue = queue.tool_limit(tool)
+        if queue.queued >= queue.max_queue:
+            queue.rejected += 1
+            logger.warning(
+                "Rejected call of %s on MCP server '%s': server queue full", tool, server
+            )
+            raise QueueFullError(
+                f"Queue of MCP server '{server}' is full", self._retry_after(queue)
+            )
+        if queue.tool_queued.get(tool, 0) >= tool_max_queue:
+            queue.rejected += 1
+            logger.warning(
+                "Rejected call of %s on MCP server '%s': tool queue full", tool, server
+            )
+            raise QueueFullError(
+                f"Queue of tool '{tool}' on MCP server '{server}' is full",
+                self._retry_after(queue),
+            )
+
+        # virtual finish time of the call; heavier tenants advance slower
+        weight = self.tenant_weights.get(tenant, self.default_weight)
+        start = max(queue.virtual_time, queue.last_finish.get(tenant, 0.0))
+        finish = start + 1.0 / weight
+        queue.last_finish[tenant] = finish
+
+        pending = _Pending(tenant, tool, asyncio.get_running_loop().create_future())
+        heapq.heappush(queue.heap, (finish, next(self._seq), pending))
+        queue.queued += 1
+        queue.tool_queued[tool] = queue.tool_queued.get(tool, 0) + 1
+        queue.tenant_queued[tenant] = queue.tenant_queued.get(tenant, 0) + 1
+        self._dispatch(queue)
+
+        try:
+            await pending.future
+        except asyncio.CancelledError:
+            if pending.future.cancelled():
+                self._dequeue(queue, pending)
+            else:
+                # the slot was granted right before cancellation, give it back
+                self._release(queue, tool)
+                self._dispatch(queue)
+            raise
+
+    async def run(
+        self,
+        server: str,
+        tool: str,
+        call: Callable[[], Awaitable[Any]],
+        tenant: str = "anonymous",
+    ) -> Any:
+        """
+        Run a tool call once the limits of its server and tool allow it.
+
+        Args:
+            server (str): The name of the MCP server.
+            tool (str): The name of the tool.
+            call (Callable): A function returning the awaitable to run.
+            tenant (str, optional): The tenant (API key) issuing the call. Defaults to "anonymous".
+
+        Returns:
+            The result of the call.
+
+        Raises:
+            QueueFullError: If the server or tool queue is full.
+        """
+        await self._wait(server, tool, tenant)
+
+        queue = self._servers[server]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            return await call()
+        finally:
+            queue.avg_latency = 0.8 * queue.avg_latency + 0.2 * (loop.time() - started)
+            self._release(queue, tool)
+            self._dispatch(queue)
+
+    def stats(self) -> dict[str, Any]:
+        """Returns queue depth and concurrency of every server seen so far."""
+        result = {}
+        for name, queue in self._servers.items():
+            tools = set(queue.tool_running) | set(queue.tool_queued)
+            result[name] = {
+                "running": queue.running,
+                "queued": queue.queued,
+                "rejected": queue.rejected,
+                "max_concurrency": queue.max_concurrency,
+                "max_queue": queue.max_queue,
+                "avg_latency": round(queue.avg_latency, 4),
+                "tools": {
+                    tool: {
+                        "running": queue.tool_running.get(tool, 0),
+                        "queued": queue.tool_queued.get(tool, 0),
+                    }
+                    for tool in sorted(tools)
+                },
+                "tenants": {
+                    tenant: count
+                    for tenant, count in queue.tenant_queued.items()
+                    if count > 0
+                },
+            }
+        return result
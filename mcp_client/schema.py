@@ -0,0 +1,400 @@
+import re
+import json
+import math
+from typing import Any, Callable
+
+from .logger import logger
+
+Validator = Callable[[Any, str, list[str], bool], Any]
+
+_INTEGER = re.compile(r"^[+-]?\d+$")
+
+
+class SchemaValidationError(ValueError):
+    """Raised when tool arguments do not match the input schema of the tool."""
+
+    def __init__(self, errors: list[str], context: str = "Invalid arguments"):
+        super().__init__(f"{context}: {'; '.join(errors)}")
+        self.errors = errors
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    """Compares JSON values, telling booleans apart from numbers."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    return a == b
+
+
+def _accept(value, path, errors, coerce):
+    return value
+
+
+def _coerce(value: Any, expected: str) -> Any:
+    """
+    Converts value to the expected JSON type if it can be done without loss.
+
+    Returns the converted value, or value itself if it cannot be converted.
+    """
+    actual = _type_name(value)
+    if actual == expected or (expected == "number" and actual == "integer"):
+        return value
+
+    if expected == "integer":
+        if actual == "string" and _INTEGER.match(value.strip()):
+            return int(value)
+        if actual == "number" and value.is_integer():
+            return int(value)
+    elif expected == "number" and actual == "string":
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        if math.isfinite(number):
+            return int(number) if _INTEGER.match(value.strip()) else number
+    elif expected == "boolean" and actual == "string":
+        lowered = value.strip().lower()
+        if lowered in ("true", "false"):
+            return lowered == "true"
+    elif expected == "string" and actual in ("integer", "number"):
+        return str(value)
+    elif expected in ("object", "array") and actual == "string":
+        # models often send nested JSON as a string
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return value
+        if _type_name(parsed) == expected:
+            return parsed
+    return value
+
+
+class _Compiler:
+    """
+    Compiles a JSON schema into nested validator closures.
+
+    Every validator takes the value, its path, the list to append errors to
+    and whether type coercion is allowed, and returns the (coerced) value.
+    """
+
+    def __init__(self, root: dict[str, Any]):
+        self.root = root
+        self.refs: dict[str, Validator] = dict()
+
+    def _resolve(self, ref: str) -> Any:
+        """Returns the schema a local reference points to, or None."""
+        if not ref.startswith("#"):
+            return None
+        node: Any = self.root
+        for part in ref[1:].split("/"):
+            if not part:
+                continue
+            part = part.replace("~1", "/").replace("~0", "~")
+            if isinstance(node, list) and part.isdigit() and int(part) < len(node):
+                node = node[int(part)]
+            elif isinstance(node, dict) and part in node:
+                node = node[part]
+            else:
+                return None
+        return node
+
+    def _ref(self, ref: str) -> Validator:
+        if ref not in self.refs:
+            target_schema = self._resolve(ref)
+            if target_schema is None:
+                # remote or dangling references are left to the server
+                logger.warning("Skipping unsupported schema reference '%s'", ref)
+                self.refs[ref] = _accept
+                return _accept
+
+            # placeholder first, so recursive schemas terminate
+            target: list[Validator] = []
+            self.refs[ref] = lambda value, path, errors, coerce: target[0](
+                value, path, errors, coerce
+            )
+            target.append(self.compile(target_schema))
+        return self.refs[ref]
+
+    def compile(self, schema: Any) -> Validator:
+        if schema is False:
+            def reject(value, path, errors, coerce):
+                errors.append(f"{path}: no value is allowed")
+                return value
+
+            return reject
+        if not isinstance(schema, dict) or not schema:
+            return _accept
+
+        checks: list[Validator] = []
+
+        if "$ref" in schema:
+            checks.append(self._ref(schema["$ref"]))
+
+        types = schema.get("type")
+        if types is not None:
+            checks.append(self._type(types if isinstance(types, list) else [types]))
+
+        if "enum" in schema:
+            checks.append(self._enum(schema["enum"]))
+        if "const" in schema:
+            checks.append(self._enum([schema["const"]]))
+
+        if "anyOf" in schema:
+            checks.append(self._any_of([self.compile(s) for s in schema["anyOf"]]))
+        if "oneOf" in schema:
+            checks.append(
+                self._any_of([self.compile(s) for s in schema["oneOf"]], exclusive=True)
+            )
+        for sub_schema in schema.get("allOf", []):
+            checks.append(self.compile(sub_schema))
+
+        if any(
+            key in schema for key in ("properties", "required", "additionalProperties")
+        ):
+            checks.append(self._object(schema))
+        if "items" in schema or "minItems" in schema or "maxItems" in schema:
+            checks.append(self._array(schema))
+        if any(key in schema for key in ("minLength", "maxLength", "pattern")):
+            checks.append(self._string(schema))
+        if any(
+            key in schema
+            for key in ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum")
+        ):
+            checks.append(self._number(schema))
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def validate(value, path, errors, coerce):
+            for check in checks:
+                value = check(value, path, errors, coerce)
+            return value
+
+        return validate
+
+    def _type(self, types: list[str]) -> Validator:
+        def validate(value, path, errors, coerce):
+            actual = _type_name(value)
+            if actual in types or (actual == "integer" and "number" in types):
+                return value
+            if coerce:
+                for expected in types:
+                    coerced = _coerce(value, expected)
+                    if coerced is not value:
+                        return coerced
+            errors.append(f"{path}: expected {' or '.join(types)}, got {actual}")
+            return value
+
+        return validate
+
+    def _enum(self, options: list[Any]) -> Validator:
+        def validate(value, path, errors, coerce):
+            if not any(_json_equal(value, option) for option in options):
+                errors.append(f"{path}: must be one of {json.dumps(options)}")
+            return value
+
+        return validate
+
+    def _any_of(self, validators: list[Validator], exclusive: bool = False) -> Validator:
+        """
+        Validates anyOf, or oneOf if exclusive.
+
+        Every branch is first checked without coercion, so a value that already
+        matches a branch is kept as-is. Only if none matches are the branches
+        checked again with coercion. With exclusive, the value must match
+        exactly one branch in the pass that accepts it.
+        """
+
+        def match(value, path, coerce, messages):
+            results = []
+            for sub_validator in validators:
+                sub_errors: list[str] = []
+                result = sub_validator(value, path, sub_errors, coerce)
+                if not sub_errors:
+                    results.append(result)
+                    if not exclusive:
+                        break
+                messages.extend(sub_errors)
+            return results
+
+        def validate(value, path, errors, coerce):
+            messages: list[str] = []
+            results = match(value, path, False, messages)
+            if not results and coerce:
+                messages = []
+                results = match(value, path, True, messages)
+
+            if len(results) == 1:
+                return results[0]
+            if results:
+                errors.append(
+                    f"{path}: matches {len(results)} of the schemas, expected exactly one"
+                )
+            else:
+                errors.append(
+                    f"{path}: matches none of the allowed schemas ({'; '.join(messages)})"
+                )
+            return value
+
+        return validate
+
+    def _object(self, schema: dict[str, Any]) -> Validator:
+        properties = {
+            name: self.compile(sub_schema)
+            for name, sub_schema in schema.get("properties", {}).items()
+        }
+        required = schema.get("required", [])
+        additional = schema.get("additionalProperties", True)
+        additional_validator = (
+            self.compile(additional) if isinstance(additional, dict) else None
+        )
+
+        def validate(value, path, errors, coerce):
+            if not isinstance(value, dict):
+                return value
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}: missing required property '{name}'")
+
+            result = {}
+            for name, item in value.items():
+                sub_validator = properties.get(name, additional_validator)
+                if sub_validator is not None:
+                    item = sub_validator(item, f"{path}.{name}", errors, coerce)
+                elif name not in properties and additional is False:
+                    errors.append(f"{path}: unexpected property '{name}'")
+                result[name] = item
+            return result
+
+        return validate
+
+    def _array(self, schema: dict[str, Any]) -> Validator:
+        items = self.compile(schema["items"]) if "items" in schema else None
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+
+        def validate(value, path, errors, coerce):
+            if not isinstance(value, list):
+                return value
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{path}: expected at least {min_items} items")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{path}: expected at most {max_items} items")
+            if items is None:
+                return value
+            return [
+                items(item, f"{path}[{i}]", errors, coerce)
+                for i, item in enumerate(value)
+            ]
+
+        return validate
+
+    def _string(self, schema: dict[str, Any]) -> Validator:
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+        pattern = None
+        if "pattern" in schema:
+            try:
+                pattern = re.compile(schema["pattern"])
+            except (re.error, TypeError):
+                # e.g. \p{L}, which Python's re does not support
+                logger.warning(
+                    "Skipping unsupported schema pattern '%s'", schema["pattern"]
+                )
+
+        def validate(value, path, errors, coerce):
+            if not isinstance(value, str):
+                return value
+            if min_length is not None and len(value) < min_length:
+                errors.append(f"{path}: expected at least {min_length} characters")
+            if max_length is not None and len(value) > max_length:
+                errors.append(f"{path}: expected at most {max_length} characters")
+            if pattern is not None and not pattern.search(value):
+                errors.append(f"{path}: does not match pattern '{pattern.pattern}'")
+            return value
+
+        return validate
+
+    def _number(self, schema: dict[str, Any]) -> Validator:
+        minimum = schema.get("minimum")
+        maximum = schema.get("maximum")
+        exclusive_minimum = schema.get("exclusiveMinimum")
+        exclusive_maximum = schema.get("exclusiveMaximum")
+
+        # draft-04 form: a boolean that makes minimum / maximum exclusive
+        if isinstance(exclusive_minimum, bool):
+            if exclusive_minimum:
+                minimum, exclusive_minimum = None, minimum
+            else:
+                exclusive_minimum = None
+        if isinstance(exclusive_maximum, bool):
+            if exclusive_maximum:
+                maximum, exclusive_maximum = None, maximum
+            else:
+                exclusive_maximum = None
+
+        def validate(value, path, errors, coerce):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return value
+            if minimum is not None and value < minimum:
+                errors.append(f"{path}: must be >= {minimum}")
+            if maximum is not None and value > maximum:
+                errors.append(f"{path}: must be <= {maximum}")
+            if exclusive_minimum is not None and value <= exclusive_minimum:
+                errors.append(f"{path}: must be > {exclusive_minimum}")
+            if exclusive_maximum is not None and value >= exclusive_maximum:
+                errors.append(f"{path}: must be < {exclusive_maximum}")
+            return value
+
+        return validate
+
+
+def compile_schema(schema: dict[str, Any]) -> Callable[[Any], Any]:
+    """
+    Compiles a JSON schema into a validator function.
+
+    The validator returns the value with safe type coercions applied (e.g. "5"
+    to 5 for an integer, a JSON string to an object), or raises
+    SchemaValidationError listing every mismatch. Values are only coerced
+    where they do not already match; in anyOf and oneOf a branch matching
+    as-is always wins over one that would need coercion.
+
+    Keywords the compiler cannot handle (remote references, patterns Python's
+    re does not support) are skipped, leaving those checks to the server; a
+    schema that cannot be compiled at all accepts every value.
+    """
+    try:
+        validator = _Compiler(schema).compile(schema)
+    except Exception as e:
+        logger.warning("Skipping validation against an unsupported schema: %s", e)
+        validator = _accept
+
+    def validate(value: Any) -> Any:
+        errors: list[str] = []
+        value = validator(value, "args", errors, True)
+        if errors:
+            raise SchemaValidationError(errors)
+        return value
+
+    return validate
@@ -0,0 +1,299 @@
+import json
+import asyncio
+from typing import Any
+
+import httpx
+
+
+class ServiceError(Exception):
+    """Raised when the MCP service returns an error."""
+
+
+class ServiceBusyError(ServiceError):
+    """Raised when the MCP service rejects a call because its queue is full."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _BaseServiceClient:
+    """Shared request building and response handling of the service clients."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: str | None = None,
+        timeout: float = 30.0,
+        max_connections: int = 10,
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        # path -> (etag, payload) of the last response
+        self._etags: dict[str, tuple[str, dict]] = dict()
+
+    def _headers(self) -> dict[str, str]:
+        headers = {}
+        if self.api_key is not None:
+            headers["X-API-Key"] = self.api_key
+        return headers
+
+    def _conditional_headers(self, path: str) -> dict[str, str]:
+        cached = self._etags.get(path)
+        if cached is None:
+            return {}
+        return {"If-None-Match": cached[0]}
+
+    def _read_cached(self, path: str, response: httpx.Response) -> dict:
+        """Returns the payload of a GET, reusing the cached copy on 304."""
+        if response.status_code == 304:
+            return self._etags[path][1]
+        self._check(response)
+        payload = response.json()
+        etag = response.headers.get("ETag")
+        if etag is not None:
+            self._etags[path] = (etag, payload)
+        return payload
+
+    @staticmethod
+    def _check(response: httpx.Response) -> None:
+        if response.status_code == 429:
+            payload = response.json()
+            raise ServiceBusyError(
+                payload.get("error", "Service busy"),
+                float(response.headers.get("Retry-After", payload.get("retry_after", 1))),
+            )
+        if response.is_error:
+            raise ServiceError(f"{response.status_code}: {response.text}")
+
+    @staticmethod
+    def _batch_result(payload: dict) -> str | ServiceBusyError:
+        if "error" in payload:
+            return ServiceBusyError(payload["error"], payload.get("retry_after", 1.0))
+        return payload["result"]
+
+    @staticmethod
+    def _as_dict(args: dict[str, Any] | str) -> dict[str, Any]:
+        return json.loads(args) if isinstance(args, str) else args
+
+
+class ServiceClient(_BaseServiceClient):
+    """
+    A synchronous client for the MCP REST service (mcp-service.py).
+
+    Keeps connections alive across calls and revalidates /system_prompt and
+    /tools responses with ETags.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: str | None = None,
+        timeout: float = 30.0,
+        max_connections: int = 10,
+        **client_kwargs,
+    ):
+        """
+        Initializes the ServiceClient.
+
+        Args:
+            base_url (str, optional): The URL of the MCP service. Defaults to "http://localhost:8000".
+            api_key (str, optional): The API key sent as X-API-Key. Defaults to None.
+            timeout (float, optional): The request timeout in seconds. Defaults to 30.0.
+            max_connections (int, optional): The size of the connection pool. Defaults to 10.
+            **client_kwargs: Extra arguments for httpx.Client.
+        """
+        super().__init__(base_url, api_key, timeout, max_connections)
+        self.client = httpx.Client(
+            base_url=base_url,
+            headers=self._headers(),
+            timeout=self.timeout,
+            limits=self.limits,
+            **client_kwargs,
+        )
+
+    def _get_cached(self, path: str) -> dict:
+        response = self.client.get(path, headers=self._conditional_headers(path))
+        return self._read_cached(path, response)
+
+    def get_system_prompt(self) -> str:
+        return self._get_cached("/system_prompt")["system_prompt"]
+
+    def get_tools(self, server: str) -> str:
+        return self._get_cached(f"/tools/{server}")["tools"]
+
+    def execute_tool(self, server: str, tool: str, args: dict[str, Any] | str) -> str:
+        response = self.client.post(f"/execute/{server}/{tool}", json=self._as_dict(args))
+        self._check(response)
+        return response.json()["result"]
+
+    def execute_batch(
+        self, calls: list[tuple[str, str, dict[str, Any] | str]]
+    ) -> list[str | ServiceBusyError]:
+        """
+        Executes several tool calls in a single request.
+
+        Args:
+            calls (list): (server, tool, args) tuples.
+
+        Returns:
+            list: The result of each call, or a ServiceBusyError if it was rejected.
+        """
+        body = [
+            {"server": server, "tool": tool, "args": self._as_dict(args)}
+            for server, tool, args in calls
+        ]
+        response = self.client.post("/execute_batch", json=body)
+        self._check(response)
+        return [self._batch_result(item) for item in response.json()["results"]]
+
+    def get_stats(self) -> dict[str, Any]:
+        response = self.client.get("/stats")
+        self._check(response)
+        return response.json()["servers"]
+
+    def close(self) -> None:
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncServiceClient(_BaseServiceClient):
+    """
+    An asyncio client for the MCP REST service (mcp-service.py).
+
+    Besides connection pooling and ETag revalidation, concurrent execute_tool
+    calls issued within batch_window seconds are sent as one /execute_batch
+    request.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: str | None = None,
+        timeout: float = 30.0,
+        max_connections: int = 10,
+        batch_window: float = 0.005,
+        max_batch_size: int = 32,
+        **client_kwargs,
+    ):
+        """
+        Initializes the AsyncServiceClient.
+
+        Args:
+            base_url (str, optional): The URL of the MCP service. Defaults to "http://localhost:8000".
+            api_key (str, optional): The API key sent as X-API-Key. Defaults to None.
+            timeout (float, optional): The request timeout in seconds. Defaults to 30.0.
+            max_connections (int, optional): The size of the connection pool. Defaults to 10.
+            batch_window (float, optional): How long to collect calls before sending a batch. Defaults to 0.005.
+            max_batch_size (int, optional): The maximum number of calls in a batch. Defaults to 32.
+            **client_kwargs: Extra arguments for httpx.AsyncClient.
+        """
+        super().__init__(base_url, api_key, timeout, max_connections)
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=self._headers(),
+            timeout=self.timeout,
+            limits=self.limits,
+            **client_kwargs,
+        )
+        self._pending: list[tuple[dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        # in-flight batches, referenced so they are not garbage collected
+        self._tasks: set[asyncio.Task] = set()
+
+    async def _get_cached(self, path: str) -> dict:
+        response = await self.client.get(path, headers=self._conditional_headers(path))
+        return self._read_cached(path, response)
+
+    async def get_system_prompt(self) -> str:
+        return (await self._get_cached("/system_prompt"))["system_prompt"]
+
+    async def get_tools(self, server: str) -> str:
+        return (await self._get_cached(f"/tools/{server}"))["tools"]
+
+    async def execute_tool(
+        self, server: str, tool: str, args: dict[str, Any] | str
+    ) -> str:
+        """Queues a tool call for the next batch and waits for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        call = {"server": server, "tool": tool, "args": self._as_dict(args)}
+        self._pending.append((call, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.create_task(self._send(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, pending: list[tuple[dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            if len(pending) == 1:
+                call = pending[0][0]
+                response = await self.client.post(
+                    f"/execute/{call['server']}/{call['tool']}", json=call["args"]
+                )
+                self._check(response)
+                results = [response.json()["result"]]
+            else:
+                response = await self.client.post(
+                    "/execute_batch", json=[call for call, _ in pending]
+                )
+                self._check(response)
+                results = [
+                    self._batch_result(item) for item in response.json()["results"]
+                ]
+        except Exception as e:
+            results = [e] * len(pending)
+
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def get_stats(self) -> dict[str, Any]:
+        response = await self.client.get("/stats")
+        self._check(response)
+        return response.json()["servers"]
+
+    async def close(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if pending:
+            await self._send(pending)
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,69 @@
+import json
+import time
+import queue
+import atexit
+import threading
+from typing import Any
+
+
+class TraceRecorder:
+    """
+    Records chat turns, LLM calls and tool calls to a JSONL trace.
+
+    Each line is one event with its wall-clock timestamp ("ts"), the session it
+    belongs to, its kind ("turn", "llm" or "tool") and kind-specific fields
+    such as latencies, tool arguments and results. Traces can be re-driven
+    with trace-replay.py.
+
+    Events are written by a background thread, so recording never blocks the
+    event loop on file I/O.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._queue: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _write_loop(self) -> None:
+        while True:
+            line = self._queue.get()
+            if line is None:
+                break
+            self._file.write(line)
+            # flush once the backlog is drained, not after every event
+            if self._queue.empty():
+                self._file.flush()
+        self._file.close()
+
+    def record(self, session: str, kind: str, **fields: Any) -> None:
+        event = {"ts": time.time(), "session": session, "kind": kind, **fields}
+        self._queue.put(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+
+    def close(self) -> None:
+        """Writes out the queued events and closes the trace."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        atexit.unregister(self.close)
+
+
+def load_trace(path: str) -> dict[str, list[dict[str, Any]]]:
+    """Reads a trace and groups its events by session, in time order."""
+    sessions: dict[str, list[dict[str, Any]]] = dict()
+    with open(path, encoding="utf-8") as trace_file:
+        for line in trace_file:
+            line = line.strip()
+            if not line:
+                continue
+            event = json.loads(line)
+            sessions.setdefault(event["session"], []).append(event)
+
+    for events in sessions.values():
+        events.sort(key=lambda event: event["ts"])
+    return sessions
@@ -1,14 +1,20 @@
 import os
+import time
+import uuid
 import asyncio
 import shutil
 from typing import Any, Annotated
 from pydantic.networks import AnyUrl, UrlConstraints
 from contextlib import AsyncExitStack
 
+import httpx
 from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
 
-from .logger import logger
+from .logger import logger, call_id, truncate
+from .schema import compile_schema, SchemaValidationError
 
 
 class Tool:
@@ -20,6 +26,23 @@ class Tool:
         self.name: str = name
         self.description: str = description
         self.input_schema: dict[str, Any] = input_schema
+        self._validator: Any | None = None
+
+    def validate(self, arguments: dict[str, Any] | str) -> dict[str, Any]:
+        """
+        Validate arguments against the input schema, applying safe coercions.
+
+        The schema is compiled on first use and reused afterwards.
+
+        Returns:
+            The validated (and possibly coerced) arguments.
+
+        Raises:
+            SchemaValidationError: If the arguments do not match the schema.
+        """
+        if self._validator is None:
+            self._validator = compile_schema(self.input_schema)
+        return self._validator(arguments)
 
     def __str__(self) -> str:
         """
@@ -81,11 +104,32 @@ class ServerConnection:
         self.config: dict[str, Any] = config
         self.stdio_context: Any | None = None
         self.session: ClientSession | None = None
+        self.tools: dict[str, Tool] | None = None
+        # unknown tool names reload the catalog at most this often
+        self.tools_refresh_interval: float = config.get("tools_refresh_interval", 30.0)
+        self._tools_listed_at: float | None = None
         self._cleanup_lock: asyncio.Lock = asyncio.Lock()
         self.exit_stack: AsyncExitStack = AsyncExitStack()
 
     async def initialize(self) -> None:
         """Initialize the server connection."""
+        try:
+            if self.config.get("url"):
+                read, write = await self._open_http_transport()
+            else:
+                read, write = await self._open_stdio_transport()
+            session = await self.exit_stack.enter_async_context(
+                ClientSession(read, write)
+            )
+            await session.initialize()
+            self.session = session
+        except Exception as e:
+            logger.error("Error initializing server %s: %s", self.name, e)
+            await self.cleanup()
+            raise
+
+    async def _open_stdio_transport(self) -> tuple[Any, Any]:
+        """Launch the server as a local subprocess and connect over stdio."""
         command = (
             shutil.which("npx")
             if self.config["command"] == "npx"
@@ -101,20 +145,64 @@ class ServerConnection:
                 {**os.environ, **self.config["env"]} if self.config.get("env") else None
             ),
         )
-        try:
-            stdio_transport = await self.exit_stack.enter_async_context(
-                stdio_client(server_params)
+        read, write = await self.exit_stack.enter_async_context(
+            stdio_client(server_params)
+        )
+        return read, write
+
+    async def _open_http_transport(self) -> tuple[Any, Any]:
+        """Connect to a remote server over SSE or streamable HTTP."""
+        url = self.config["url"]
+        transport = self.config.get(
+            "transport", "sse" if url.rstrip("/").endswith("/sse") else "streamable-http"
+        )
+        headers = self.config.get("headers")
+        timeout = self.config.get("timeout", 30)
+        sse_read_timeout = self.config.get("sse_read_timeout", 300)
+
+        if transport == "sse":
+            read, write = await self.exit_stack.enter_async_context(
+                sse_client(
+                    url,
+                    headers=headers,
+                    timeout=timeout,
+                    sse_read_timeout=sse_read_timeout,
+                    httpx_client_factory=self._http_client_factory,
+                )
             )
-            read, write = stdio_transport
-            session = await self.exit_stack.enter_async_context(
-                ClientSession(read, write)
+        elif transport == "streamable-http":
+            read, write, _ = await self.exit_stack.enter_async_context(
+                streamablehttp_client(
+                    url,
+                    headers=headers,
+                    timeout=timeout,
+                    sse_read_timeout=sse_read_timeout,
+                    httpx_client_factory=self._http_client_factory,
+                )
             )
-            await session.initialize()
-            self.session = session
-        except Exception as e:
-            logger.error(f"Error initializing server {self.name}: {e}")
-            await self.cleanup()
-            raise
+        else:
+            raise ValueError(f"Unsupported transport '{transport}' of server {self.name}")
+        return read, write
+
+    def _http_client_factory(
+        self,
+        headers: dict[str, str] | None = None,
+        timeout: httpx.Timeout | None = None,
+        auth: httpx.Auth | None = None,
+    ) -> httpx.AsyncClient:
+        """Create the HTTP client of the session, keeping connections alive between requests."""
+        max_connections = self.config.get("max_connections", 10)
+        return httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout if timeout is not None else httpx.Timeout(30.0),
+            auth=auth,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=self.config.get("keepalive_expiry", 60.0),
+            ),
+        )
 
     async def list_tool(self):
         """List available tools from the server."""
@@ -122,13 +210,55 @@ class ServerConnection:
             raise RuntimeError(f"Server {self.name} not initialized")
 
         tools = []
+        cached = self.tools or {}
         tools_response = await self.session.list_tools()
         for item in tools_response:
             if isinstance(item, tuple) and item[0] == "tools":
                 for tool in item[1]:
-                    tools.append(Tool(tool.name, tool.description, tool.inputSchema))
+                    # keep the cached tool, and its compiled validator, if unchanged
+                    known = cached.get(tool.name)
+                    if (
+                        known is not None
+                        and known.description == tool.description
+                        and known.input_schema == tool.inputSchema
+                    ):
+                        tools.append(known)
+                    else:
+                        tools.append(
+                            Tool(tool.name, tool.description, tool.inputSchema)
+                        )
+        self.tools = {tool.name: tool for tool in tools}
+        self._tools_listed_at = time.monotonic()
         return tools
 
+    async def validate_arguments(
+        self, tool_name: str, arguments: dict[str, Any] | str
+    ) -> dict[str, Any]:
+        """Check a call against the tool catalog before sending it to the server."""
+        if self.tools is None:
+            await self.list_tool()
+        tool = self.tools.get(tool_name)
+        if (
+            tool is None
+            and time.monotonic() - self._tools_listed_at >= self.tools_refresh_interval
+        ):
+            # the server may have added the tool since the catalog was cached;
+            # throttled, so invented tool names do not cost a round trip each
+            self._tools_listed_at = time.monotonic()
+            await self.list_tool()
+            tool = self.tools.get(tool_name)
+        if tool is None:
+            raise ValueError(
+                f"Unknown tool '{tool_name}' of server {self.name}. "
+                f"Available tools: {', '.join(self.tools)}"
+            )
+        try:
+            return tool.validate(arguments)
+        except SchemaValidationError as e:
+            raise SchemaValidationError(
+                e.errors, f"Invalid arguments for tool '{tool_name}'"
+            ) from None
+
     async def execute_tool(
         self,
         tool_name: str,
@@ -140,24 +270,42 @@ class ServerConnection:
         if not self.session:
             raise RuntimeError(f"Server {self.name} not initialized")
 
-        attempt = 0
-        while attempt < retries:
-            try:
-                logger.info(f"Executing {tool_name}...")
-                result = await self.session.call_tool(tool_name, arguments)
-                return result
+        token = call_id.set(uuid.uuid4().hex[:16])
+        try:
+            # invalid calls can never succeed, reject them before any retry
+            arguments = await self.validate_arguments(tool_name, arguments)
 
-            except Exception as e:
-                attempt += 1
-                logger.warning(
-                    f"Error executing tool: {e}. Attempt {attempt} of {retries}."
-                )
-                if attempt < retries:
-                    logger.info(f"Retrying in {delay} seconds...")
-                    await asyncio.sleep(delay)
-                else:
-                    logger.error("Max retries reached. Failing.")
-                    raise
+            attempt = 0
+            while attempt < retries:
+                try:
+                    logger.info(
+                        "Executing %s with args %s",
+                        tool_name,
+                        truncate(arguments),
+                        extra={"sampled": True},
+                    )
+                    result = await self.session.call_tool(tool_name, arguments)
+                    logger.debug(
+                        "Tool %s returned %s",
+                        tool_name,
+                        truncate(result),
+                        extra={"sampled": True},
+                    )
+                    return result
+
+                except Exception as e:
+                    attempt += 1
+                    logger.warning(
+                        "Error executing tool: %s. Attempt %d of %d.", e, attempt, retries
+                    )
+                    if attempt < retries:
+                        logger.info("Retrying in %s seconds...", delay)
+                        await asyncio.sleep(delay)
+                    else:
+                        logger.error("Max retries reached. Failing.")
+                        raise
+        finally:
+            call_id.reset(token)
 
     async def list_resources(self):
         """List available resources from the server."""
@@ -195,4 +343,4 @@ class ServerConnection:
                 self.session = None
                 self.stdio_context = None
             except Exception as e:
-                logger.error(f"Error during cleanup of server {self.name}: {e}")
+                logger.error("Error during cleanup of server %s: %s", self.name, e)
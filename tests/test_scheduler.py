@@ -0,0 +1,195 @@
+import asyncio
+
+import pytest
+
+from mcp_client.scheduler import QueueFullError, ToolScheduler
+
+
+async def settle():
+    """Lets every ready task run until they all block again."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+class Calls:
+    """Starts scheduled calls that run until released, recording their start order."""
+
+    def __init__(self, scheduler: ToolScheduler, server: str = "s"):
+        self.scheduler = scheduler
+        self.server = server
+        self.started: list[str] = []
+        self.release = asyncio.Event()
+
+    def start(self, tool: str, tenant: str = "anonymous", label: str | None = None):
+        async def call():
+            self.started.append(label or tenant)
+            await self.release.wait()
+            return label
+
+        return asyncio.create_task(
+            self.scheduler.run(self.server, tool, call, tenant)
+        )
+
+
+def test_weighted_fair_order():
+    async def main():
+        scheduler = ToolScheduler({"max_concurrency": 1, "tenants": {"a": 2.0}})
+        calls = Calls(scheduler)
+        blocker = calls.start("t", "x")
+        await settle()
+
+        # tenant "a" has twice the weight of "b"
+        tasks = [calls.start("t", "a") for _ in range(4)]
+        tasks += [calls.start("t", "b") for _ in range(2)]
+        await settle()
+        assert scheduler.stats()["s"]["tenants"] == {"a": 4, "b": 2}
+
+        calls.release.set()
+        await asyncio.gather(blocker, *tasks)
+        assert "".join(calls.started) == "xaabaab"
+
+    asyncio.run(main())
+
+
+def test_saturated_tool_is_skipped():
+    async def main():
+        scheduler = ToolScheduler(
+            {
+                "max_concurrency": 2,
+                "servers": {"s": {"tools": {"slow": {"max_concurrency": 1}}}},
+            }
+        )
+        calls = Calls(scheduler)
+        tasks = [
+            calls.start("slow", label="slow-1"),
+            calls.start("slow", label="slow-2"),
+            calls.start("fast", label="fast-1"),
+        ]
+        await settle()
+
+        # fast-1 queued behind slow-2 but runs first, the slow tool is saturated
+        assert calls.started == ["slow-1", "fast-1"]
+        stats = scheduler.stats()["s"]
+        assert stats["running"] == 2
+        assert stats["tools"]["slow"] == {"running": 1, "queued": 1}
+
+        calls.release.set()
+        await asyncio.gather(*tasks)
+        assert calls.started == ["slow-1", "fast-1", "slow-2"]
+
+        # slow-2 had the smaller finish tag but was dispatched last
+        queue = scheduler._servers["s"]
+        assert queue.virtual_time == 2.0
+
+    asyncio.run(main())
+
+
+def test_virtual_time_is_monotonic():
+    async def main():
+        scheduler = ToolScheduler(
+            {
+                "max_concurrency": 2,
+                "servers": {"s": {"tools": {"slow": {"max_concurrency": 1}}}},
+            }
+        )
+        calls = Calls(scheduler)
+        tasks = [
+            calls.start("slow", "a"),
+            calls.start("slow", "a"),
+            calls.start("fast", "a"),
+        ]
+        await settle()
+        calls.release.set()
+        await asyncio.gather(*tasks)
+
+        # a new tenant starts from the current virtual time, not behind it
+        calls.release.clear()
+        queue = scheduler._servers["s"]
+        tasks = [calls.start("slow", "a") for _ in range(2)]
+        tasks.append(calls.start("slow", "b"))
+        await settle()
+        assert queue.virtual_time == 2.0
+        assert sorted(entry[0] for entry in queue.heap) == [3.0, 3.0]
+
+        calls.release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+
+
+def test_full_queues_reject():
+    async def main():
+        scheduler = ToolScheduler(
+            {
+                "max_concurrency": 1,
+                "max_queue": 2,
+                "servers": {"s": {"tools": {"t": {"max_queue": 1}}}},
+            }
+        )
+        calls = Calls(scheduler)
+        tasks = [calls.start("t"), calls.start("t")]
+        await settle()
+
+        with pytest.raises(QueueFullError, match="Queue of tool 't'") as error:
+            await calls.start("t")
+        assert error.value.retry_after >= 1.0
+
+        tasks.append(calls.start("u"))
+        await settle()
+        with pytest.raises(QueueFullError, match="Queue of MCP server 's'"):
+            await calls.start("u")
+        assert scheduler.stats()["s"]["rejected"] == 2
+
+        calls.release.set()
+        await asyncio.gather(*tasks)
+        stats = scheduler.stats()["s"]
+        assert (stats["running"], stats["queued"], stats["tenants"]) == (0, 0, {})
+
+    asyncio.run(main())
+
+
+def test_cancelled_while_queued():
+    async def main():
+        scheduler = ToolScheduler({"max_concurrency": 1})
+        calls = Calls(scheduler)
+        blocker = calls.start("t", "x")
+        waiter = calls.start("t", "y")
+        await settle()
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        queue = scheduler._servers["s"]
+        assert (queue.queued, queue.tenant_queued, queue.last_finish) == (0, {}, {})
+        assert queue.tool_queued["t"] == 0
+
+        calls.release.set()
+        await blocker
+        assert calls.started == ["x"]
+        assert queue.running == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_after_grant_returns_slot():
+    async def main():
+        scheduler = ToolScheduler({"max_concurrency": 1})
+        calls = Calls(scheduler)
+        await scheduler._wait("s", "t", "x")
+        waiter = calls.start("t", "y")
+        await settle()
+
+        # grant the slot to the waiter, then cancel it before it resumes
+        queue = scheduler._servers["s"]
+        scheduler._release(queue, "t")
+        scheduler._dispatch(queue)
+        assert (queue.running, queue.queued) == (1, 0)
+        waiter.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert calls.started == []
+        assert queue.running == 0
+        assert queue.tool_running["t"] == 0
+
+    asyncio.run(main())
@@ -0,0 +1,205 @@
+import pytest
+
+from mcp_client.schema import SchemaValidationError, compile_schema
+from mcp_client.utils import Tool
+
+
+def test_type_coercion():
+    validate = compile_schema(
+        {
+            "type": "object",
+            "properties": {
+                "count": {"type": "integer"},
+                "ratio": {"type": "number"},
+                "flag": {"type": "boolean"},
+                "name": {"type": "string"},
+                "options": {"type": "object"},
+            },
+        }
+    )
+    assert validate(
+        {"count": "5", "ratio": "0.5", "flag": "True", "name": 7, "options": '{"a": 1}'}
+    ) == {"count": 5, "ratio": 0.5, "flag": True, "name": "7", "options": {"a": 1}}
+
+
+def test_type_mismatch():
+    validate = compile_schema({"type": "integer"})
+    with pytest.raises(SchemaValidationError) as error:
+        validate("five")
+    assert error.value.errors == ["args: expected integer, got string"]
+
+
+def test_any_of_keeps_exact_match():
+    validate = compile_schema({"anyOf": [{"type": "string"}, {"type": "integer"}]})
+    assert validate(5) == 5
+    assert validate("5") == "5"
+
+    validate = compile_schema({"anyOf": [{"type": "number"}, {"type": "string"}]})
+    assert validate("007") == "007"
+    assert validate(7) == 7
+
+
+def test_any_of_coerces_when_nothing_matches():
+    validate = compile_schema({"anyOf": [{"type": "integer"}, {"type": "null"}]})
+    assert validate("5") == 5
+    assert validate(None) is None
+    with pytest.raises(SchemaValidationError):
+        validate("five")
+
+
+def test_nested_any_of_is_strict_first():
+    validate = compile_schema(
+        {
+            "anyOf": [
+                {"type": "object", "properties": {"id": {"type": "integer"}}},
+                {"type": "string"},
+            ]
+        }
+    )
+    assert validate('{"id": "1"}') == '{"id": "1"}'
+    assert validate({"id": "1"}) == {"id": 1}
+
+
+def test_one_of_is_exclusive():
+    validate = compile_schema({"oneOf": [{"type": "integer"}, {"type": "string"}]})
+    assert validate(5) == 5
+    assert validate("5") == "5"
+
+    validate = compile_schema({"oneOf": [{"type": "number"}, {"type": "integer"}]})
+    assert validate(1.5) == 1.5
+    with pytest.raises(SchemaValidationError) as error:
+        validate(1)
+    assert "expected exactly one" in str(error.value)
+
+
+def test_object_keywords():
+    validate = compile_schema(
+        {
+            "type": "object",
+            "properties": {"path": {"type": "string"}},
+            "required": ["path"],
+            "additionalProperties": False,
+        }
+    )
+    assert validate({"path": "/tmp"}) == {"path": "/tmp"}
+    with pytest.raises(SchemaValidationError) as error:
+        validate({"mode": "r"})
+    assert error.value.errors == [
+        "args: missing required property 'path'",
+        "args: unexpected property 'mode'",
+    ]
+
+
+def test_recursive_ref():
+    validate = compile_schema(
+        {
+            "$ref": "#/$defs/node",
+            "$defs": {
+                "node": {
+                    "type": "object",
+                    "properties": {
+                        "value": {"type": "integer"},
+                        "children": {"type": "array", "items": {"$ref": "#/$defs/node"}},
+                    },
+                }
+            },
+        }
+    )
+    tree = {"value": "1", "children": [{"value": 2, "children": []}]}
+    assert validate(tree) == {"value": 1, "children": [{"value": 2, "children": []}]}
+    with pytest.raises(SchemaValidationError) as error:
+        validate({"value": 1, "children": [{"value": "x"}]})
+    assert error.value.errors == ["args.children[0].value: expected integer, got string"]
+
+
+def test_constraints():
+    validate = compile_schema(
+        {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "minLength": 2, "pattern": "^[a-z]+$"},
+                "size": {"type": "integer", "minimum": 1, "exclusiveMaximum": 10},
+                "tags": {"type": "array", "maxItems": 1},
+                "mode": {"enum": ["r", "w"]},
+            },
+        }
+    )
+    with pytest.raises(SchemaValidationError) as error:
+        validate({"name": "A", "size": 10, "tags": [1, 2], "mode": "x"})
+    assert len(error.value.errors) == 5
+
+
+def test_unsupported_pattern_is_skipped():
+    validate = compile_schema(
+        {
+            "type": "object",
+            "properties": {"name": {"type": "string", "pattern": r"^\p{L}+$"}},
+            "required": ["name"],
+        }
+    )
+    assert validate({"name": "名字"}) == {"name": "名字"}
+    with pytest.raises(SchemaValidationError):
+        validate({})
+
+
+def test_unsupported_ref_is_skipped():
+    validate = compile_schema(
+        {
+            "type": "object",
+            "properties": {
+                "remote": {"$ref": "https://example.com/schemas/item.json"},
+                "dangling": {"$ref": "#/$defs/missing"},
+                "count": {"type": "integer"},
+            },
+        }
+    )
+    assert validate({"remote": [1], "dangling": "x", "count": "2"}) == {
+        "remote": [1],
+        "dangling": "x",
+        "count": 2,
+    }
+
+
+def test_uncompilable_schema_accepts_everything():
+    validate = compile_schema({"type": "object", "properties": ["a"]})
+    assert validate({"a": [1]}) == {"a": [1]}
+
+
+def test_tool_caches_fallback_validator():
+    tool = Tool("lookup", "", {"$ref": "https://example.com/schema.json"})
+    assert tool.validate({"q": 1}) == {"q": 1}
+    validator = tool._validator
+    assert validator is not None
+    tool.validate({"q": 2})
+    assert tool._validator is validator
+
+
+def test_draft_04_exclusive_bounds():
+    validate = compile_schema(
+        {"type": "integer", "minimum": 0, "exclusiveMinimum": True, "maximum": 10}
+    )
+    assert validate(1) == 1
+    assert validate(10) == 10
+    with pytest.raises(SchemaValidationError) as error:
+        validate(0)
+    assert error.value.errors == ["args: must be > 0"]
+
+    validate = compile_schema(
+        {"type": "number", "maximum": 1, "exclusiveMaximum": False}
+    )
+    assert validate(1) == 1
+
+
+def test_enum_tells_booleans_from_numbers():
+    validate = compile_schema({"enum": [1, [0, {"a": False}]]})
+    assert validate(1) == 1
+    assert validate(1.0) == 1.0
+    assert validate([0, {"a": False}]) == [0, {"a": False}]
+    for value in (True, [False, {"a": 0}]):
+        with pytest.raises(SchemaValidationError):
+            validate(value)
+
+    validate = compile_schema({"const": True})
+    assert validate(True) is True
+    with pytest.raises(SchemaValidationError):
+        validate(1)
@@ -0,0 +1,37 @@
+import json
+import asyncio
+import argparse
+
+from mcp_client.trace import load_trace
+from mcp_client.replay import Replayer
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded trace against stub LLM and MCP backends."
+    )
+    parser.add_argument("trace", help="The JSONL trace to replay.")
+    parser.add_argument(
+        "--mode", choices=["chat", "stream", "service"], default="chat"
+    )
+    parser.add_argument(
+        "--sessions", type=int, default=1, help="Number of concurrent sessions."
+    )
+    parser.add_argument("--speed", type=float, default=1.0, help="Speed-up factor.")
+    parser.add_argument(
+        "--url", default=None, help="Replay against a running MCP service (service mode)."
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="Report the peak Python heap."
+    )
+    args = parser.parse_args()
+
+    replayer = Replayer(
+        load_trace(args.trace), args.mode, args.sessions, args.speed, args.url
+    )
+    report = await replayer.run(args.trace_memory)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())